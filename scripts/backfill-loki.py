@@ -5,32 +5,161 @@ Scans ~/.claude/projects/**/*.jsonl, extracts tool_use/tool_result events,
 and pushes structured logs to Loki's native push API.
 """
 
+# /// script
+# requires-python = ">=3.10"
+# dependencies = ["orjson"]
+# ///
+
 import argparse
+import gzip
+import heapq
+import http.client
 import json
+import mmap
 import os
+import random
 import sys
+import threading
 import time
-import urllib.request
-import urllib.error
-from collections import defaultdict
+import urllib.parse
+from collections import Counter, OrderedDict, defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from itertools import islice, pairwise
+from operator import attrgetter
 from pathlib import Path
 
+def _json_dumps(obj):
+    """Compact JSON bytes, the same JSON as orjson.dumps.
+
+    Non-ASCII stays \\u-escaped (equivalent JSON for Loki/LogQL), which
+    also keeps lone surrogates from json.loads encodable.
+    """
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+try:
+    from orjson import dumps as _orjson_dumps, loads as _orjson_loads
+except ImportError:  # stdlib fallback when orjson is not installed
+    from json import loads as _loads
+
+    _dumps = _json_dumps
+else:
+    def _loads(data):
+        """orjson.loads, retried with json.loads before giving up.
+
+        orjson rejects lone surrogate escapes (e.g. in truncated tool
+        output) that the stdlib parser accepts; dropping those lines would
+        silently lose their events.
+        """
+        try:
+            return _orjson_loads(data)
+        except ValueError:
+            return json.loads(data)
+
+    def _dumps(obj):
+        """orjson.dumps, or _json_dumps for strs orjson won't encode."""
+        try:
+            return _orjson_dumps(obj)
+        except TypeError:  # lone surrogates from the json.loads retry
+            return _json_dumps(obj)
+
+
+_READ_CHUNK = 1 << 20  # 1 MiB
+_MMAP_THRESHOLD = 4 << 20  # files larger than 4 MiB are memory-mapped
+_MAX_RETRY_WAIT = 60  # seconds
+_GZIP_MIN_BYTES = 1024  # smaller payloads aren't worth compressing
+_MAX_PENDING_TOOLS = 10_000  # unmatched tool_use entries kept per file
+
+# datetime.fromisoformat (C-implemented) accepts a trailing "Z" from 3.11 on;
+# skipping the str.replace there trims about a quarter off parse_timestamp.
+_ISO_ACCEPTS_Z = sys.version_info >= (3, 11)
+
+# Keep-alive connections reused across pushes, one set per thread
+# (http.client connections are not thread-safe).
+_conn_local = threading.local()
+
+
+@dataclass(slots=True)
+class ToolEvent:
+    """One completed tool call (tool_use matched to its tool_result)."""
+
+    timestamp_ns: int
+    project: str
+    session_id: str
+    tool_name: str
+    success: bool
+    duration_ms: int | None
+    tool_parameters: str | None
+
+
+@dataclass
+class Stats:
+    """Summary statistics accumulated as events are extracted."""
+
+    n: int = 0
+    success: int = 0
+    error: int = 0
+    dur_sum: int = 0
+    dur_n: int = 0
+    ts_min: int | None = None
+    ts_max: int | None = None
+    tool_counts: Counter = field(default_factory=Counter)
+    project_counts: Counter = field(default_factory=Counter)
+
+    def add(self, ev):
+        self.n += 1
+        self.tool_counts[ev.tool_name] += 1
+        self.project_counts[ev.project] += 1
+        if ev.success:
+            self.success += 1
+        else:
+            self.error += 1
+        if ev.duration_ms is not None:
+            self.dur_sum += ev.duration_ms
+            self.dur_n += 1
+        ts = ev.timestamp_ns
+        if self.ts_min is None or ts < self.ts_min:
+            self.ts_min = ts
+        if self.ts_max is None or ts > self.ts_max:
+            self.ts_max = ts
+
+
+def _walk_jsonl(path):
+    """Yield paths of .jsonl files under path, without following symlinks.
+
+    os.scandir's DirEntry caches the d_type from readdir, so this avoids the
+    per-entry Path objects and stat calls of Path.rglob.
+    """
+    try:
+        it = os.scandir(path)
+    except PermissionError:
+        return  # unreadable directory: skip it, as Path.rglob did
+    with it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _walk_jsonl(entry.path)
+            elif entry.name.endswith(".jsonl"):
+                yield entry.path
+
 
 def find_jsonl_files(projects_dir):
     """Recursively find all .jsonl files under projects_dir."""
-    root = Path(projects_dir)
-    if not root.is_dir():
+    if not os.path.isdir(projects_dir):
         print(f"ERROR: {projects_dir} is not a directory", file=sys.stderr)
         sys.exit(1)
-    return sorted(root.rglob("*.jsonl"))
+    # Sort by path components, matching the old sorted(Path.rglob()) order
+    return sorted(_walk_jsonl(projects_dir), key=lambda p: p.split(os.sep))
 
 
 def parse_timestamp(ts_str):
     """Parse ISO 8601 timestamp to epoch seconds (float)."""
     if not ts_str:
         return None
-    ts_str = ts_str.replace("Z", "+00:00")
+    if not _ISO_ACCEPTS_Z:
+        ts_str = ts_str.replace("Z", "+00:00")
     try:
         dt = datetime.fromisoformat(ts_str)
         return dt.timestamp()
@@ -38,6 +167,45 @@ def parse_timestamp(ts_str):
         return None
 
 
+def _iter_lines(fh):
+    """Yield newline-delimited lines (without the newline) from a binary file.
+
+    Reads fixed-size chunks and splits on b"\n" with bytearray.find (memchr),
+    which is much cheaper than Python's per-line file iterator. Large files
+    are memory-mapped instead, letting the kernel page them in on demand
+    without copying through a read buffer.
+    """
+    if os.fstat(fh.fileno()).st_size > _MMAP_THRESHOLD:
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            pos = 0
+            while True:
+                idx = mm.find(b"\n", pos)
+                if idx == -1:
+                    break
+                yield mm[pos:idx]
+                pos = idx + 1
+            if pos < len(mm):
+                yield mm[pos:]
+        return
+
+    buf = bytearray()
+    while True:
+        chunk = fh.read(_READ_CHUNK)
+        if not chunk:
+            break
+        buf += chunk
+        start = 0
+        while True:
+            idx = buf.find(b"\n", start)
+            if idx == -1:
+                break
+            yield buf[start:idx]
+            start = idx + 1
+        del buf[:start]
+    if buf:
+        yield buf
+
+
 def extract_project_name(filepath):
     """Extract project name from the JSONL path.
 
@@ -56,42 +224,68 @@ def extract_session_id(filepath):
     return Path(filepath).stem
 
 
+def _bash_parameters(input_dict):
+    cmd = input_dict.get("command")
+    if isinstance(cmd, str):
+        return _dumps({"bash_command": cmd}).decode("utf-8")
+    return None
+
+
+def _skill_parameters(input_dict):
+    skill = input_dict.get("skill")
+    if isinstance(skill, str):
+        return _dumps({"skill_name": skill}).decode("utf-8")
+    return None
+
+
+# tool name -> builder for its tool_parameters; other tools have none
+_PARAM_BUILDERS = {
+    "Bash": _bash_parameters,
+    "Skill": _skill_parameters,
+}
+
+
 def build_tool_parameters(tool_name, input_dict):
     """Build tool_parameters JSON string for structured metadata."""
-    if not isinstance(input_dict, dict):
+    if not isinstance(tool_name, str) or not isinstance(input_dict, dict):
         return None
-    if tool_name == "Bash":
-        cmd = input_dict.get("command")
-        if isinstance(cmd, str):
-            return json.dumps({"bash_command": cmd})
-    elif tool_name == "Skill":
-        skill = input_dict.get("skill")
-        if isinstance(skill, str):
-            return json.dumps({"skill_name": skill})
-    return None
+    builder = _PARAM_BUILDERS.get(tool_name)
+    if builder is None:
+        return None
+    return builder(input_dict)
 
 
 def extract_tool_events(filepath):
     """Parse a JSONL file and extract tool events.
 
     Correlates tool_use blocks (assistant messages) with tool_result blocks
-    (user messages) by tool_use_id. Returns list of event dicts.
+    (user messages) by tool_use_id. Returns (project, list of ToolEvent);
+    every event in a file belongs to the same project.
     """
     project = extract_project_name(filepath)
     session_id = extract_session_id(filepath)
-    # pending_tools: id -> {name, input, timestamp}
-    pending_tools = {}
+    # pending_tools: id -> {name, params, timestamp}. Only the small
+    # tool_parameters string is kept, not the full input (which can hold
+    # entire file contents for Write/Edit) while awaiting the result.
+    # Bounded by _MAX_PENDING_TOOLS so truncated sessions full of
+    # unanswered calls can't grow it without limit; an OrderedDict gives
+    # O(1) oldest-first eviction via popitem(last=False).
+    pending_tools = OrderedDict()
     events = []
 
     try:
-        with open(filepath, "r", encoding="utf-8") as fh:
-            for raw_line in fh:
-                line = raw_line.strip()
+        # Binary mode: raw bytes go straight to the parser (no str decode)
+        with open(filepath, "rb") as fh:
+            for line in _iter_lines(fh):
                 if not line:
                     continue
+                # Most lines are text/thinking with no tool blocks; a byte
+                # substring test is far cheaper than parsing them.
+                if b'"tool_use"' not in line and b'"tool_result"' not in line:
+                    continue
                 try:
-                    data = json.loads(line)
-                except json.JSONDecodeError:
+                    data = _loads(line)
+                except ValueError:  # json/orjson JSONDecodeError
                     continue
 
                 ts = parse_timestamp(data.get("timestamp"))
@@ -114,11 +308,22 @@ def extract_tool_events(filepath):
                         if block.get("type") == "tool_use":
                             tool_id = block.get("id")
                             if tool_id:
+                                name = block.get("name", "unknown")
+                                if isinstance(name, str):
+                                    # Few distinct tool names, many events:
+                                    # one object per name in this file, and
+                                    # pickling back to main() keeps that
+                                    name = sys.intern(name)
                                 pending_tools[tool_id] = {
-                                    "name": block.get("name", "unknown"),
-                                    "input": block.get("input", {}),
+                                    "name": name,
+                                    "params": build_tool_parameters(
+                                        name, block.get("input")
+                                    ),
                                     "timestamp": ts,
                                 }
+                                if len(pending_tools) > _MAX_PENDING_TOOLS:
+                                    # Evict the oldest still-unmatched call
+                                    pending_tools.popitem(last=False)
 
                 # Scan user messages for tool_result blocks
                 if data.get("type") == "user":
@@ -142,168 +347,253 @@ def extract_tool_events(filepath):
                         if duration_ms <= 0 or duration_ms > 600_000:
                             duration_ms = None
 
-                        tool_params = build_tool_parameters(
-                            pending["name"], pending["input"]
-                        )
-
-                        events.append({
-                            "timestamp_ns": str(int(ts * 1_000_000_000)),
-                            "project": project,
-                            "session_id": session_id,
-                            "tool_name": pending["name"],
-                            "success": success,
-                            "duration_ms": duration_ms,
-                            "tool_parameters": tool_params,
-                        })
+                        events.append(ToolEvent(
+                            timestamp_ns=int(ts * 1_000_000_000),
+                            project=project,
+                            session_id=session_id,
+                            tool_name=pending["name"],
+                            success=success,
+                            duration_ms=duration_ms,
+                            tool_parameters=pending["params"],
+                        ))
 
     except (OSError, UnicodeDecodeError) as e:
         print(f"  WARN: skipping {filepath}: {e}", file=sys.stderr)
 
-    return events
+    return project, events
 
 
-def push_to_loki(events, loki_url, batch_size, dry_run=False):
-    """Group events by project, sort by timestamp, push in batches."""
-    # Group by project
-    by_project = defaultdict(list)
-    for ev in events:
-        by_project[ev["project"]].append(ev)
+def push_to_loki(by_project, loki_url, batch_size, dry_run=False,
+                 concurrency=8):
+    """Merge each project's events by timestamp and push them in batches.
+
+    `by_project` maps project -> list of per-file ToolEvent lists. Projects
+    (one Loki stream each) are pushed concurrently by up to `concurrency`
+    threads; batches within a project stay in timestamp order so Loki never
+    sees a stream go backwards.
+    """
+    url = f"{loki_url}/loki/api/v1/push"
+    # Set while Loki is answering 429: pushes then go through `serial`
+    # one at a time until a request succeeds again.
+    rate_limited = threading.Event()
+    serial = threading.Lock()
 
     total_pushed = 0
     total_errors = 0
 
-    for project, proj_events in sorted(by_project.items()):
-        proj_events.sort(key=lambda e: e["timestamp_ns"])
-
-        # Push in batches
-        for i in range(0, len(proj_events), batch_size):
-            batch = proj_events[i : i + batch_size]
-            values = []
-            for ev in batch:
-                log_line = (
-                    f"tool_result: {ev['tool_name']} "
-                    f"success={str(ev['success']).lower()}"
+    with ThreadPoolExecutor(max_workers=concurrency) as ex:
+        futures = [
+            ex.submit(
+                _push_project, project, runs, url, batch_size,
+                dry_run, rate_limited, serial,
+            )
+            for project, runs in sorted(by_project.items())
+        ]
+        for fut in futures:
+            pushed, errors = fut.result()
+            total_pushed += pushed
+            total_errors += errors
+
+    return total_pushed, total_errors
+
+
+def _push_project(project, runs, url, batch_size, dry_run,
+                  rate_limited, serial):
+    """Push one project's events in timestamp-ordered batches.
+
+    `runs` holds one event list per file. Each is normally chronological
+    already, so a k-way heapq.merge replaces sorting the concatenation
+    (any out-of-order file is sorted on its own first). The merge is
+    stable, giving the same order as a stable sort of the concatenation.
+    """
+    key = attrgetter("timestamp_ns")
+    for run in runs:
+        if any(a.timestamp_ns > b.timestamp_ns for a, b in pairwise(run)):
+            run.sort(key=key)
+    merged = heapq.merge(*runs, key=key)
+    pushed = 0
+    errors = 0
+
+    # Invariant across batches: the stream labels, and one log line per
+    # (tool, outcome) pair.
+    stream = {"service_name": "claude-code", "project": project}
+    log_lines = {}
+
+    # Push in batches
+    while True:
+        batch = list(islice(merged, batch_size))
+        if not batch:
+            break
+        values = []
+        for ev in batch:
+            tool_name = ev.tool_name
+            success = "true" if ev.success else "false"
+            log_line = log_lines.get((tool_name, success))
+            if log_line is None:
+                log_line = log_lines[(tool_name, success)] = (
+                    f"tool_result: {tool_name} success={success}"
                 )
-                metadata = {
-                    "event_name": "tool_result",
-                    "tool_name": ev["tool_name"],
-                    "success": str(ev["success"]).lower(),
-                    "session_id": ev["session_id"],
-                }
-                if ev["duration_ms"] is not None:
-                    metadata["duration_ms"] = str(ev["duration_ms"])
-                if ev["tool_parameters"]:
-                    metadata["tool_parameters"] = ev["tool_parameters"]
-
-                values.append([ev["timestamp_ns"], log_line, metadata])
-
-            payload = {
-                "streams": [
-                    {
-                        "stream": {
-                            "service_name": "claude-code",
-                            "project": project,
-                        },
-                        "values": values,
-                    }
-                ]
+            metadata = {
+                "event_name": "tool_result",
+                "tool_name": tool_name,
+                "success": success,
+                "session_id": ev.session_id,
             }
+            if ev.duration_ms is not None:
+                metadata["duration_ms"] = str(ev.duration_ms)
+            if ev.tool_parameters:
+                metadata["tool_parameters"] = ev.tool_parameters
 
-            if dry_run:
-                total_pushed += len(batch)
-                continue
+            values.append([str(ev.timestamp_ns), log_line, metadata])
+
+        payload = {"streams": [{"stream": stream, "values": values}]}
+
+        if dry_run:
+            pushed += len(batch)
+            continue
+
+        try:
+            if rate_limited.is_set():
+                with serial:
+                    _post_json(url, payload, rate_limited=rate_limited)
+            else:
+                _post_json(url, payload, rate_limited=rate_limited)
+            pushed += len(batch)
+        except Exception as e:
+            errors += 1
+            print(
+                f"  ERROR pushing batch for {project}: {e}",
+                file=sys.stderr,
+            )
+
+    return pushed, errors
+
+
+def _get_connection(scheme, netloc):
+    """Return this thread's keep-alive connection to scheme://netloc."""
+    conns = getattr(_conn_local, "conns", None)
+    if conns is None:
+        conns = _conn_local.conns = {}
+    conn = conns.get((scheme, netloc))
+    if conn is None:
+        if scheme == "https":
+            conn = http.client.HTTPSConnection(netloc)
+        else:
+            conn = http.client.HTTPConnection(netloc)
+        conns[(scheme, netloc)] = conn
+    return conn
 
+
+def _drop_connection(scheme, netloc):
+    """Close and forget this thread's connection to scheme://netloc."""
+    conns = getattr(_conn_local, "conns", {})
+    conn = conns.pop((scheme, netloc), None)
+    if conn is not None:
+        conn.close()
+
+
+def _retry_wait(retry_after, attempt):
+    """Seconds to wait before retrying, capped at _MAX_RETRY_WAIT.
+
+    Honors a Retry-After header (delay-seconds or HTTP-date) when present,
+    otherwise uses exponential backoff with +/-50% jitter so concurrent
+    clients don't retry in lockstep.
+    """
+    if retry_after:
+        try:
+            wait = float(retry_after)
+        except ValueError:
             try:
-                _post_json(f"{loki_url}/loki/api/v1/push", payload)
-                total_pushed += len(batch)
-                time.sleep(0.1)  # pace requests to avoid 429
-            except Exception as e:
-                total_errors += 1
-                print(
-                    f"  ERROR pushing batch for {project}: {e}",
-                    file=sys.stderr,
-                )
+                when = parsedate_to_datetime(retry_after)
+                wait = when.timestamp() - time.time()
+            except (TypeError, ValueError):
+                wait = None
+        if wait is not None:
+            return min(_MAX_RETRY_WAIT, max(0.0, wait))
+    return min(_MAX_RETRY_WAIT, 2 ** attempt) * random.uniform(0.5, 1.5)
 
-    return total_pushed, total_errors
 
+def _post_json(url, payload, max_retries=5, rate_limited=None):
+    """POST JSON payload over a keep-alive connection.
 
-def _post_json(url, payload, max_retries=5):
-    """POST JSON payload using stdlib urllib, with retry on 429."""
-    data = json.dumps(payload).encode("utf-8")
-    req = urllib.request.Request(
-        url,
-        data=data,
-        headers={"Content-Type": "application/json"},
-        method="POST",
-    )
+    Retries on 429 and 5xx responses, honoring Retry-After. If given,
+    the `rate_limited` event is set on 429 and cleared on success.
+    Payloads of _GZIP_MIN_BYTES or more are sent gzip-compressed.
+    """
+    data = _dumps(payload)
+    headers = {"Content-Type": "application/json"}
+    if len(data) >= _GZIP_MIN_BYTES:
+        # Batches repeat the same labels and keys; level 3 shrinks them
+        # several-fold for negligible CPU.
+        data = gzip.compress(data, compresslevel=3)
+        headers["Content-Encoding"] = "gzip"
+    parts = urllib.parse.urlsplit(url)
+    path = parts.path or "/"
+    if parts.query:
+        path += "?" + parts.query
     for attempt in range(max_retries):
+        conn = _get_connection(parts.scheme, parts.netloc)
         try:
-            with urllib.request.urlopen(req) as resp:
-                resp.read()
-            return
-        except urllib.error.HTTPError as e:
-            body = e.read().decode("utf-8", errors="replace")
-            if e.code == 429 and attempt < max_retries - 1:
-                wait = 2 ** attempt
-                print(
-                    f"  429 retry {attempt + 1}/{max_retries} "
-                    f"(wait {wait}s): {body[:200]}",
-                    file=sys.stderr,
-                )
-                time.sleep(wait)
+            conn.request("POST", path, body=data, headers=headers)
+            resp = conn.getresponse()
+            raw = resp.read()
+        except (http.client.HTTPException, OSError):
+            # Stale keep-alive socket or network error: reconnect and retry
+            _drop_connection(parts.scheme, parts.netloc)
+            if attempt < max_retries - 1:
                 continue
-            raise Exception(f"HTTP {e.code}: {body[:300]}")
+            raise
+        if 200 <= resp.status < 300:
+            if rate_limited is not None:
+                rate_limited.clear()
+            return
+        body = raw.decode("utf-8", errors="replace")
+        if resp.status == 429 and rate_limited is not None:
+            rate_limited.set()
+        retryable = resp.status == 429 or resp.status >= 500
+        if retryable and attempt < max_retries - 1:
+            wait = _retry_wait(resp.getheader("Retry-After"), attempt)
+            print(
+                f"  {resp.status} retry {attempt + 1}/{max_retries} "
+                f"(wait {wait:.1f}s): {body[:200]}",
+                file=sys.stderr,
+            )
+            time.sleep(wait)
+            continue
+        raise Exception(f"HTTP {resp.status}: {body[:300]}")
 
 
-def _print_summary(events):
+def _print_summary(stats):
     """Print summary stats to stderr."""
-    if not events:
+    if not stats.n:
         print("No tool events found.", file=sys.stderr)
         return
 
-    projects = set()
-    tool_counts = defaultdict(int)
-    success_count = 0
-    error_count = 0
-    durations = []
-
-    for ev in events:
-        projects.add(ev["project"])
-        tool_counts[ev["tool_name"]] += 1
-        if ev["success"]:
-            success_count += 1
-        else:
-            error_count += 1
-        if ev["duration_ms"] is not None:
-            durations.append(ev["duration_ms"])
-
     # Timestamp range
-    ts_values = [int(ev["timestamp_ns"]) for ev in events]
     date_min = datetime.fromtimestamp(
-        min(ts_values) / 1e9, tz=timezone.utc
+        stats.ts_min / 1e9, tz=timezone.utc
     ).strftime("%Y-%m-%d")
     date_max = datetime.fromtimestamp(
-        max(ts_values) / 1e9, tz=timezone.utc
+        stats.ts_max / 1e9, tz=timezone.utc
     ).strftime("%Y-%m-%d")
 
-    avg_dur = sum(durations) / len(durations) if durations else 0
+    avg_dur = stats.dur_sum / stats.dur_n if stats.dur_n else 0
 
     print(f"\n{'=' * 60}", file=sys.stderr)
-    print(f"  Total events:    {len(events):,}", file=sys.stderr)
-    print(f"  Projects:        {len(projects)}", file=sys.stderr)
+    print(f"  Total events:    {stats.n:,}", file=sys.stderr)
+    print(f"  Projects:        {len(stats.project_counts)}", file=sys.stderr)
     print(f"  Date range:      {date_min} to {date_max}", file=sys.stderr)
-    print(f"  Success:         {success_count:,}", file=sys.stderr)
-    print(f"  Errors:          {error_count:,}", file=sys.stderr)
+    print(f"  Success:         {stats.success:,}", file=sys.stderr)
+    print(f"  Errors:          {stats.error:,}", file=sys.stderr)
     print(f"  Avg duration:    {avg_dur:,.0f} ms", file=sys.stderr)
     print(f"\n  By tool (top 15):", file=sys.stderr)
+    tool_counts = stats.tool_counts
     for tool, count in sorted(
         tool_counts.items(), key=lambda x: x[1], reverse=True
     )[:15]:
         print(f"    {tool}: {count:,}", file=sys.stderr)
     print(f"\n  By project:", file=sys.stderr)
-    project_counts = defaultdict(int)
-    for ev in events:
-        project_counts[ev["project"]] += 1
+    project_counts = stats.project_counts
     for proj in sorted(
         project_counts, key=project_counts.get, reverse=True
     )[:10]:
@@ -336,6 +626,12 @@ def main():
         default=100,
         help="Number of events per Loki push request (default: 100)",
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=8,
+        help="Max projects pushed to Loki in parallel (default: 8)",
+    )
     parser.add_argument(
         "--dry-run",
         action="store_true",
@@ -350,7 +646,7 @@ def main():
             dt = datetime.strptime(args.before, "%Y-%m-%d").replace(
                 tzinfo=timezone.utc
             )
-            before_ns = str(int(dt.timestamp() * 1_000_000_000))
+            before_ns = int(dt.timestamp() * 1_000_000_000)
         except ValueError:
             print(
                 f"ERROR: invalid date format '{args.before}', use YYYY-MM-DD",
@@ -361,26 +657,40 @@ def main():
     jsonl_files = find_jsonl_files(args.projects_dir)
     print(f"Found {len(jsonl_files)} JSONL files", file=sys.stderr)
 
-    all_events = []
-    for i, fp in enumerate(jsonl_files, 1):
-        if i % 100 == 0:
-            print(f"  Parsing {i}/{len(jsonl_files)}...", file=sys.stderr)
-        events = extract_tool_events(fp)
-        all_events.extend(events)
-
-    print(f"Extracted {len(all_events):,} tool events", file=sys.stderr)
+    # Files are independent: parse them across all cores. map() keeps
+    # results in file order so output is identical to a sequential run.
+    # Events are grouped by project and the --before filter and summary
+    # stats are applied as each file's events arrive, so nothing rescans
+    # the full event set.
+    by_project = defaultdict(list)
+    total = 0
+    extracted = 0
+    stats = Stats()
+    with ProcessPoolExecutor() as ex:
+        results = ex.map(extract_tool_events, jsonl_files, chunksize=8)
+        for i, (project, events) in enumerate(results, 1):
+            if i % 100 == 0:
+                print(f"  Parsing {i}/{len(jsonl_files)}...", file=sys.stderr)
+            extracted += len(events)
+            if before_ns:
+                events = [ev for ev in events if ev.timestamp_ns < before_ns]
+            if not events:
+                continue
+            for ev in events:
+                stats.add(ev)
+            by_project[project].append(events)
+            total += len(events)
 
-    # Apply --before filter
+    print(f"Extracted {extracted:,} tool events", file=sys.stderr)
     if before_ns:
-        all_events = [ev for ev in all_events if ev["timestamp_ns"] < before_ns]
         print(
-            f"After --before filter: {len(all_events):,} events",
+            f"After --before filter: {total:,} events",
             file=sys.stderr,
         )
 
-    _print_summary(all_events)
+    _print_summary(stats)
 
-    if not all_events:
+    if not total:
         sys.exit(0)
 
     if args.dry_run:
@@ -388,11 +698,13 @@ def main():
         sys.exit(0)
 
     print(
-        f"Pushing to Loki at {args.loki_url} (batch size: {args.batch_size})",
+        f"Pushing to Loki at {args.loki_url} (batch size: {args.batch_size}, "
+        f"concurrency: {args.concurrency})",
         file=sys.stderr,
     )
     pushed, errors = push_to_loki(
-        all_events, args.loki_url, args.batch_size, dry_run=False
+        by_project, args.loki_url, args.batch_size, dry_run=False,
+        concurrency=args.concurrency,
     )
     print(f"Pushed {pushed:,} events ({errors} errors)", file=sys.stderr)
 
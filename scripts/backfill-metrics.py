@@ -5,15 +5,44 @@ Scans ~/.claude/projects/**/*.jsonl, extracts token usage from assistant events,
 and outputs OpenMetrics format suitable for `promtool tsdb create-blocks-from openmetrics`.
 """
 
+# /// script
+# dependencies = ["orjson"]
+# ///
+
 import argparse
+import functools
 import json
 import os
 import re
 import sys
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
 
+try:
+    from orjson import loads as _orjson_loads
+except ImportError:  # stdlib fallback when orjson is not installed
+    from json import loads as _loads
+else:
+    def _loads(data):
+        """orjson.loads, retried with json.loads before giving up.
+
+        orjson rejects lone surrogate escapes (e.g. in truncated tool
+        output) that the stdlib parser accepts; dropping those lines would
+        silently lose their usage and timestamps.
+        """
+        try:
+            return _orjson_loads(data)
+        except ValueError:
+            return json.loads(data)
+
+# datetime.fromisoformat accepts a trailing "Z" from Python 3.11 on, so the
+# str.replace can be skipped there (about 25% less time per timestamp).
+_ISO_ACCEPTS_Z = sys.version_info >= (3, 11)
+
+_READ_CHUNK = 1 << 20  # 1 MiB
+
 # Pricing per 1M tokens (USD)
 MODEL_PRICING = {
     "claude-opus-4": {
@@ -37,6 +66,7 @@ MODEL_PRICING = {
 }
 
 
+@functools.lru_cache(maxsize=64)
 def match_pricing(model_id):
     """Match a model ID like 'claude-sonnet-4-5-20250929' to its pricing tier."""
     if not model_id:
@@ -53,7 +83,8 @@ def parse_timestamp(ts_str):
     """Parse ISO 8601 timestamp to epoch seconds."""
     if not ts_str:
         return None
-    ts_str = ts_str.replace("Z", "+00:00")
+    if not _ISO_ACCEPTS_Z:
+        ts_str = ts_str.replace("Z", "+00:00")
     try:
         dt = datetime.fromisoformat(ts_str)
         return dt.timestamp()
@@ -74,16 +105,80 @@ def extract_project_name(filepath):
         return "unknown"
 
 
+def count_lines(text):
+    """Number of lines in an Edit/Write payload (0 for empty or non-str).
+
+    str.count with a one-character needle is already a memchr scan in
+    CPython, so the payload is counted in place rather than re-encoded.
+    """
+    if isinstance(text, str) and text:
+        return text.count("\n") + 1
+    return 0
+
+
+# (token type, usage field) pairs accumulated from assistant events
+_USAGE_FIELDS = (
+    ("input", "input_tokens"),
+    ("output", "output_tokens"),
+    ("cacheRead", "cache_read_input_tokens"),
+    ("cacheCreation", "cache_creation_input_tokens"),
+)
+
 _GIT_COMMIT_RE = re.compile(r"\bgit\s+commit\b")
 _GH_PR_CREATE_RE = re.compile(r"\bgh\s+pr\s+create\b")
 
 
+def _iter_lines(fh):
+    """Yield newline-delimited lines from a binary file read in 1 MiB chunks.
+
+    Splitting a whole chunk with bytes.split is a single C-level scan, much
+    cheaper than Python's per-line file iterator. A line spanning chunks is
+    kept as a list of pieces and joined once its newline arrives, so lines
+    longer than a chunk cost linear rather than quadratic time.
+    """
+    pending = []  # pieces of the line still waiting for its newline
+    while True:
+        chunk = fh.read(_READ_CHUNK)
+        if not chunk:
+            break
+        lines = chunk.split(b"\n")
+        if len(lines) == 1:
+            pending.append(chunk)
+            continue
+        if pending:
+            pending.append(lines[0])
+            lines[0] = b"".join(pending)
+        pending = [lines.pop()]
+        yield from lines
+    tail = b"".join(pending)
+    if tail:
+        yield tail
+
+
+def _file_contains(fh, needle):
+    """Whether needle occurs anywhere in a binary file, scanning in chunks.
+
+    Stops at the first hit. The last len(needle) - 1 bytes of each chunk are
+    rechecked with the next one so a match spanning two chunks is found.
+    """
+    keep = len(needle) - 1
+    tail = b""
+    while True:
+        chunk = fh.read(_READ_CHUNK)
+        if not chunk:
+            return False
+        if needle in chunk or needle in tail + chunk[:keep]:
+            return True
+        tail = chunk[-keep:]
+
+
 def parse_file(filepath):
     """Parse a single JSONL file. Returns raw parsed data dict or None."""
     session_id = None
     project = extract_project_name(filepath)
-    tokens = defaultdict(lambda: defaultdict(int))
-    timestamps = []
+    tokens = {}  # (model, token_type) -> count
+    start_ts = None  # running min/max of event timestamps
+    end_ts = None
     lines_added = 0
     lines_removed = 0
     # Track pending Bash tool_use IDs awaiting result confirmation
@@ -91,28 +186,52 @@ def parse_file(filepath):
     pending_prs = set()       # tool_use IDs for gh pr create commands
     commits = 0
     pull_requests = 0
+    # Bound methods hoisted out of the per-line/per-block loops
+    commit_add = pending_commits.add
+    commit_discard = pending_commits.discard
+    pr_add = pending_prs.add
+    pr_discard = pending_prs.discard
 
     try:
-        with open(filepath, "r", encoding="utf-8") as fh:
-            for raw_line in fh:
+        # Binary mode: raw bytes go straight to the parser (no str decode)
+        with open(filepath, "rb", buffering=0) as fh:
+            # Files without any usage block can never produce tokens and are
+            # dropped below anyway; one substring scan is enough to skip them.
+            if not _file_contains(fh, b'"usage"'):
+                return None
+            fh.seek(0)
+            for raw_line in _iter_lines(fh):
                 line = raw_line.strip()
                 if not line:
                     continue
+                # Only lines carrying a timestamp, sessionId or message can
+                # affect the result (summary/snapshot lines carry none), and
+                # a byte substring test is far cheaper than parsing them.
+                if (
+                    b'"timestamp"' not in line
+                    and b'"sessionId"' not in line
+                    and b'"message"' not in line
+                ):
+                    continue
                 try:
-                    data = json.loads(line)
-                except json.JSONDecodeError:
+                    data = _loads(line)
+                except ValueError:  # json/orjson JSONDecodeError
                     continue
 
+                data_get = data.get
                 if not session_id:
-                    sid = data.get("sessionId")
+                    sid = data_get("sessionId")
                     if sid:
                         session_id = sid
 
-                ts = parse_timestamp(data.get("timestamp"))
+                ts = parse_timestamp(data_get("timestamp"))
                 if ts:
-                    timestamps.append(ts)
+                    if start_ts is None or ts < start_ts:
+                        start_ts = ts
+                    if end_ts is None or ts > end_ts:
+                        end_ts = ts
 
-                msg = data.get("message")
+                msg = data_get("message")
                 if not isinstance(msg, dict):
                     continue
 
@@ -124,49 +243,49 @@ def parse_file(filepath):
                 for block in content:
                     if not isinstance(block, dict):
                         continue
-                    if block.get("type") == "tool_result":
-                        tuid = block.get("tool_use_id")
-                        if tuid and not block.get("is_error"):
+                    block_get = block.get
+                    if block_get("type") == "tool_result":
+                        tuid = block_get("tool_use_id")
+                        if tuid and not block_get("is_error"):
                             if tuid in pending_commits:
                                 commits += 1
-                                pending_commits.discard(tuid)
+                                commit_discard(tuid)
                             elif tuid in pending_prs:
                                 pull_requests += 1
-                                pending_prs.discard(tuid)
+                                pr_discard(tuid)
                         else:
-                            pending_commits.discard(tuid)
-                            pending_prs.discard(tuid)
+                            commit_discard(tuid)
+                            pr_discard(tuid)
 
-                if data.get("type") != "assistant":
+                if data_get("type") != "assistant":
                     continue
 
                 # Extract tool_use blocks for LOC, commits, PRs
                 for block in content:
-                    if not isinstance(block, dict) or block.get("type") != "tool_use":
+                    if not isinstance(block, dict):
                         continue
-                    name = block.get("name", "")
-                    inp = block.get("input", {})
+                    block_get = block.get
+                    if block_get("type") != "tool_use":
+                        continue
+                    name = block_get("name", "")
+                    inp = block_get("input", {})
                     if not isinstance(inp, dict):
                         continue
 
                     if name == "Edit":
-                        old = inp.get("old_string", "")
-                        new = inp.get("new_string", "")
-                        if isinstance(old, str) and old:
-                            lines_removed += old.count("\n") + 1
-                        if isinstance(new, str) and new:
-                            lines_added += new.count("\n") + 1
+                        lines_removed += count_lines(inp.get("old_string"))
+                        lines_added += count_lines(inp.get("new_string"))
                     elif name == "Write":
-                        wc = inp.get("content", "")
-                        if isinstance(wc, str) and wc:
-                            lines_added += wc.count("\n") + 1
+                        lines_added += count_lines(inp.get("content"))
                     elif name == "Bash":
                         cmd = inp.get("command", "")
                         if isinstance(cmd, str):
-                            if _GIT_COMMIT_RE.search(cmd):
-                                pending_commits.add(block.get("id"))
-                            elif _GH_PR_CREATE_RE.search(cmd):
-                                pending_prs.add(block.get("id"))
+                            # Cheap substring screen first; the regex only
+                            # runs on commands that could possibly match.
+                            if "commit" in cmd and _GIT_COMMIT_RE.search(cmd):
+                                commit_add(block_get("id"))
+                            elif "create" in cmd and _GH_PR_CREATE_RE.search(cmd):
+                                pr_add(block_get("id"))
 
                 # Token accounting (only on assistant events with usage)
                 usage = msg.get("usage")
@@ -174,12 +293,9 @@ def parse_file(filepath):
                     continue
 
                 model = msg.get("model", "unknown")
-                tokens[model]["input"] += usage.get("input_tokens", 0)
-                tokens[model]["output"] += usage.get("output_tokens", 0)
-                tokens[model]["cacheRead"] += usage.get("cache_read_input_tokens", 0)
-                tokens[model]["cacheCreation"] += usage.get(
-                    "cache_creation_input_tokens", 0
-                )
+                for token_type, field in _USAGE_FIELDS:
+                    key = (model, token_type)
+                    tokens[key] = tokens.get(key, 0) + usage.get(field, 0)
     except (OSError, UnicodeDecodeError) as e:
         print(f"  WARN: skipping {filepath}: {e}", file=sys.stderr)
         return None
@@ -190,8 +306,9 @@ def parse_file(filepath):
     return {
         "session_id": session_id,
         "project": project,
-        "tokens": dict(tokens),
-        "timestamps": timestamps,
+        "tokens": tokens,
+        "start_ts": start_ts,
+        "end_ts": end_ts,
         "lines_added": lines_added,
         "lines_removed": lines_removed,
         "commits": commits,
@@ -208,18 +325,28 @@ def merge_into_sessions(parsed_files):
             sessions[sid] = {
                 "session_id": sid,
                 "project": pf["project"],
-                "tokens": defaultdict(lambda: defaultdict(int)),
-                "timestamps": [],
+                "tokens": {},  # (model, token_type) -> count
+                "start_ts": None,
+                "end_ts": None,
                 "lines_added": 0,
                 "lines_removed": 0,
                 "commits": 0,
                 "pull_requests": 0,
             }
         s = sessions[sid]
-        s["timestamps"].extend(pf["timestamps"])
-        for model, counts in pf["tokens"].items():
-            for token_type, count in counts.items():
-                s["tokens"][model][token_type] += count
+        if pf["start_ts"] is not None and (
+            s["start_ts"] is None or pf["start_ts"] < s["start_ts"]
+        ):
+            s["start_ts"] = pf["start_ts"]
+        if pf["end_ts"] is not None and (
+            s["end_ts"] is None or pf["end_ts"] > s["end_ts"]
+        ):
+            s["end_ts"] = pf["end_ts"]
+        # Flat (model, token_type) keys: a single-level merge per sample
+        dst = s["tokens"]
+        dst_get = dst.get
+        for key, count in pf["tokens"].items():
+            dst[key] = dst_get(key, 0) + count
         s["lines_added"] += pf["lines_added"]
         s["lines_removed"] += pf["lines_removed"]
         s["commits"] += pf["commits"]
@@ -228,20 +355,22 @@ def merge_into_sessions(parsed_files):
     # Finalize: compute cost and time ranges
     result = []
     for s in sessions.values():
-        tokens = {m: dict(c) for m, c in s["tokens"].items()}
+        # Rebuild the nested {model: {token_type: count}} shape once
+        tokens = {}
+        for (model, token_type), count in s["tokens"].items():
+            tokens.setdefault(model, {})[token_type] = count
 
         cost_by_model = {}
         for model, counts in tokens.items():
             pricing = match_pricing(model)
+            # Only priced token types contribute; scale to USD once
             cost = sum(
-                counts.get(t, 0) * pricing.get(t, 0) / 1_000_000
-                for t in counts
-            )
+                count * pricing[t] for t, count in counts.items() if t in pricing
+            ) / 1_000_000
             cost_by_model[model] = cost
 
-        ts_list = s["timestamps"]
-        start_ts = min(ts_list) if ts_list else None
-        end_ts = max(ts_list) if ts_list else None
+        start_ts = s["start_ts"]
+        end_ts = s["end_ts"]
         active_seconds = (end_ts - start_ts) if start_ts and end_ts else 0.0
 
         result.append({
@@ -260,27 +389,47 @@ def merge_into_sessions(parsed_files):
     return result
 
 
+def _walk_jsonl(path):
+    """Yield paths of .jsonl files under path, without following symlinks.
+
+    os.scandir's DirEntry caches the d_type from readdir, so this avoids the
+    per-entry Path objects and stat calls of Path.rglob.
+    """
+    try:
+        it = os.scandir(path)
+    except PermissionError:
+        return  # unreadable directory: skip it, as Path.rglob did
+    with it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _walk_jsonl(entry.path)
+            elif entry.name.endswith(".jsonl"):
+                yield entry.path
+
+
 def find_jsonl_files(projects_dir):
     """Recursively find all .jsonl files under projects_dir."""
-    root = Path(projects_dir)
-    if not root.is_dir():
+    if not os.path.isdir(projects_dir):
         print(f"ERROR: {projects_dir} is not a directory", file=sys.stderr)
         sys.exit(1)
-    return sorted(root.rglob("*.jsonl"))
+    # Session order in the output follows file order, so keep it stable:
+    # sort by path components, matching the old sorted(Path.rglob()) order
+    return sorted(_walk_jsonl(projects_dir), key=lambda p: p.split(os.sep))
 
 
-def format_openmetrics(sessions):
-    """Format sessions as OpenMetrics text.
+def format_openmetrics(sessions, out):
+    """Write sessions as OpenMetrics text to the text stream `out`.
 
     Emits linearly interpolated data points at ~60s intervals to match
     scrape-like density and avoid Prometheus increase() extrapolation.
     Timestamps are Unix epoch seconds (float) per OpenMetrics spec.
+    Lines are written as they are produced rather than collected in memory.
     """
-    lines = []
+    write = out.write
     step = 60  # seconds
 
     def fmt(v):
-        if v == int(v):
+        if v.is_integer():
             return str(int(v))
         return f"{v:.6f}"
 
@@ -292,17 +441,20 @@ def format_openmetrics(sessions):
         # For counters starting at 0, Prometheus only extrapolates forward
         # (not backward), giving factor (2N+1)/(2N). Emitting val*2N/(2N+1)
         # cancels this so increase() returns the exact true value.
-        for i in range(n + 1):
-            frac = 2 * i / (2 * n + 1)
-            lines.append(
-                f"{metric}{{{labels}}} {fmt(val * frac)} {start + duration * i / n:.3f}"
-            )
+        # The whole series is built by one comprehension and handed to the
+        # stream in a single writelines() call.
+        prefix = f"{metric}{{{labels}}} "  # constant for the whole series
+        denom = 2 * n + 1
+        out.writelines([
+            f"{prefix}{fmt(val * (2 * i / denom))} {start + duration * i / n:.3f}\n"
+            for i in range(n + 1)
+        ])
 
     # Token usage
-    lines.append(
-        "# HELP claude_code_token_usage_tokens_total Cumulative token usage by type."
+    write(
+        "# HELP claude_code_token_usage_tokens_total Cumulative token usage by type.\n"
     )
-    lines.append("# TYPE claude_code_token_usage_tokens_total counter")
+    write("# TYPE claude_code_token_usage_tokens_total counter\n")
     for s in sessions:
         if not s["start_ts"] or not s["end_ts"]:
             continue
@@ -322,10 +474,10 @@ def format_openmetrics(sessions):
                 )
 
     # Cost
-    lines.append(
-        "# HELP claude_code_cost_usage_USD_total Cumulative cost in USD."
+    write(
+        "# HELP claude_code_cost_usage_USD_total Cumulative cost in USD.\n"
     )
-    lines.append("# TYPE claude_code_cost_usage_USD_total counter")
+    write("# TYPE claude_code_cost_usage_USD_total counter\n")
     for s in sessions:
         if not s["start_ts"] or not s["end_ts"]:
             continue
@@ -343,10 +495,10 @@ def format_openmetrics(sessions):
             )
 
     # Session count
-    lines.append(
-        "# HELP claude_code_session_count_total Session count marker."
+    write(
+        "# HELP claude_code_session_count_total Session count marker.\n"
     )
-    lines.append("# TYPE claude_code_session_count_total counter")
+    write("# TYPE claude_code_session_count_total counter\n")
     for s in sessions:
         if not s["start_ts"] or not s["end_ts"]:
             continue
@@ -360,10 +512,10 @@ def format_openmetrics(sessions):
         )
 
     # Active time
-    lines.append(
-        "# HELP claude_code_active_time_seconds_total Estimated active session time."
+    write(
+        "# HELP claude_code_active_time_seconds_total Estimated active session time.\n"
     )
-    lines.append("# TYPE claude_code_active_time_seconds_total counter")
+    write("# TYPE claude_code_active_time_seconds_total counter\n")
     for s in sessions:
         if not s["start_ts"] or not s["end_ts"] or s["active_seconds"] <= 0:
             continue
@@ -377,10 +529,10 @@ def format_openmetrics(sessions):
         )
 
     # Lines of code
-    lines.append(
-        "# HELP claude_code_lines_of_code_count_total Lines of code added or removed."
+    write(
+        "# HELP claude_code_lines_of_code_count_total Lines of code added or removed.\n"
     )
-    lines.append("# TYPE claude_code_lines_of_code_count_total counter")
+    write("# TYPE claude_code_lines_of_code_count_total counter\n")
     for s in sessions:
         if not s["start_ts"] or not s["end_ts"]:
             continue
@@ -399,10 +551,10 @@ def format_openmetrics(sessions):
             )
 
     # Commit count
-    lines.append(
-        "# HELP claude_code_commit_count_total Number of git commits."
+    write(
+        "# HELP claude_code_commit_count_total Number of git commits.\n"
     )
-    lines.append("# TYPE claude_code_commit_count_total counter")
+    write("# TYPE claude_code_commit_count_total counter\n")
     for s in sessions:
         if not s["start_ts"] or not s["end_ts"] or s["commits"] == 0:
             continue
@@ -416,10 +568,10 @@ def format_openmetrics(sessions):
         )
 
     # Pull request count
-    lines.append(
-        "# HELP claude_code_pull_request_count_total Number of pull requests created."
+    write(
+        "# HELP claude_code_pull_request_count_total Number of pull requests created.\n"
     )
-    lines.append("# TYPE claude_code_pull_request_count_total counter")
+    write("# TYPE claude_code_pull_request_count_total counter\n")
     for s in sessions:
         if not s["start_ts"] or not s["end_ts"] or s["pull_requests"] == 0:
             continue
@@ -432,8 +584,7 @@ def format_openmetrics(sessions):
             labels, s["pull_requests"], s["start_ts"], s["end_ts"],
         )
 
-    lines.append("# EOF")
-    return "\n".join(lines) + "\n"
+    write("# EOF\n")
 
 
 def main():
@@ -460,13 +611,16 @@ def main():
     jsonl_files = find_jsonl_files(args.projects_dir)
     print(f"Found {len(jsonl_files)} JSONL files", file=sys.stderr)
 
+    # Files are independent: parse them across all cores. map() keeps
+    # results in file order so output is identical to a sequential run.
     parsed = []
-    for i, fp in enumerate(jsonl_files, 1):
-        if i % 100 == 0:
-            print(f"  Parsing {i}/{len(jsonl_files)}...", file=sys.stderr)
-        result = parse_file(fp)
-        if result:
-            parsed.append(result)
+    with ProcessPoolExecutor() as ex:
+        results = ex.map(parse_file, jsonl_files, chunksize=16)
+        for i, result in enumerate(results, 1):
+            if i % 100 == 0:
+                print(f"  Parsing {i}/{len(jsonl_files)}...", file=sys.stderr)
+            if result:
+                parsed.append(result)
 
     print(f"Parsed {len(parsed)} files with usage data", file=sys.stderr)
 
@@ -477,52 +631,53 @@ def main():
     sessions = merge_into_sessions(parsed)
     print(f"Merged into {len(sessions)} unique sessions", file=sys.stderr)
 
-    # Summary stats
-    total_input = sum(
-        c.get("input", 0) for s in sessions for c in s["tokens"].values()
-    )
-    total_output = sum(
-        c.get("output", 0) for s in sessions for c in s["tokens"].values()
-    )
-    total_cache_read = sum(
-        c.get("cacheRead", 0) for s in sessions for c in s["tokens"].values()
-    )
-    total_cache_create = sum(
-        c.get("cacheCreation", 0)
-        for s in sessions
-        for c in s["tokens"].values()
-    )
-    total_cost = sum(c for s in sessions for c in s["cost_by_model"].values())
-    total_active = sum(s["active_seconds"] for s in sessions)
-    total_lines_added = sum(s["lines_added"] for s in sessions)
-    total_lines_removed = sum(s["lines_removed"] for s in sessions)
-    total_commits = sum(s["commits"] for s in sessions)
-    total_prs = sum(s["pull_requests"] for s in sessions)
-
-    all_starts = [s["start_ts"] for s in sessions if s["start_ts"]]
-    all_ends = [s["end_ts"] for s in sessions if s["end_ts"]]
-    date_min = (
-        datetime.fromtimestamp(min(all_starts), tz=timezone.utc).strftime("%Y-%m-%d")
-        if all_starts else "?"
-    )
-    date_max = (
-        datetime.fromtimestamp(max(all_ends), tz=timezone.utc).strftime("%Y-%m-%d")
-        if all_ends else "?"
-    )
-
+    # Summary stats, gathered in a single pass over the sessions. Float
+    # totals are accumulated in the same session/model order the separate
+    # sum() passes used, so the printed figures are unchanged.
+    total_input = total_output = total_cache_read = total_cache_create = 0
+    total_cost = total_active = 0.0
+    total_lines_added = total_lines_removed = total_commits = total_prs = 0
+    first_start = last_end = None
     model_tokens = defaultdict(int)
     model_cost = defaultdict(float)
+    project_sessions = defaultdict(int)
+    project_cost = defaultdict(float)
     for s in sessions:
+        cost_by_model = s["cost_by_model"]
+        s_cost = 0
         for model, counts in s["tokens"].items():
+            total_input += counts.get("input", 0)
+            total_output += counts.get("output", 0)
+            total_cache_read += counts.get("cacheRead", 0)
+            total_cache_create += counts.get("cacheCreation", 0)
             model_tokens[model] += sum(counts.values())
-        for model, cost in s["cost_by_model"].items():
+            cost = cost_by_model[model]
+            total_cost += cost
             model_cost[model] += cost
+            s_cost += cost
+        project = s["project"]
+        project_sessions[project] += 1
+        project_cost[project] += s_cost
+        total_active += s["active_seconds"]
+        total_lines_added += s["lines_added"]
+        total_lines_removed += s["lines_removed"]
+        total_commits += s["commits"]
+        total_prs += s["pull_requests"]
+        start_ts = s["start_ts"]
+        if start_ts and (first_start is None or start_ts < first_start):
+            first_start = start_ts
+        end_ts = s["end_ts"]
+        if end_ts and (last_end is None or end_ts > last_end):
+            last_end = end_ts
 
-    project_sessions = defaultdict(int)
-    project_cost = defaultdict(float)
-    for s in sessions:
-        project_sessions[s["project"]] += 1
-        project_cost[s["project"]] += sum(s["cost_by_model"].values())
+    date_min = (
+        datetime.fromtimestamp(first_start, tz=timezone.utc).strftime("%Y-%m-%d")
+        if first_start else "?"
+    )
+    date_max = (
+        datetime.fromtimestamp(last_end, tz=timezone.utc).strftime("%Y-%m-%d")
+        if last_end else "?"
+    )
 
     print(f"\n{'=' * 60}", file=sys.stderr)
     print(f"  Sessions:        {len(sessions)}", file=sys.stderr)
@@ -555,15 +710,14 @@ def main():
         print("Dry run — no output generated.", file=sys.stderr)
         sys.exit(0)
 
-    output = format_openmetrics(sessions)
-
     if args.output:
         Path(args.output).parent.mkdir(parents=True, exist_ok=True)
-        with open(args.output, "w") as f:
-            f.write(output)
-        print(f"Wrote {len(output)} bytes to {args.output}", file=sys.stderr)
+        with open(args.output, "w", buffering=1 << 20) as f:
+            format_openmetrics(sessions, f)
+            size = f.tell()
+        print(f"Wrote {size} bytes to {args.output}", file=sys.stderr)
     else:
-        sys.stdout.write(output)
+        format_openmetrics(sessions, sys.stdout)
 
 
 if __name__ == "__main__":
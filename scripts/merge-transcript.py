@@ -2,20 +2,28 @@
 """Merge paginated transcript HTML files into a single file."""
 
 # /// script
-# dependencies = ["beautifulsoup4"]
+# dependencies = ["beautifulsoup4", "lxml"]
 # ///
 
+import importlib.util
 import re
 from pathlib import Path
 from bs4 import BeautifulSoup
 
-def merge_transcripts(transcript_dir: Path, output_file: Path):
-    """Merge all transcript pages into a single HTML file."""
+# lxml's C parser is much faster than the pure-Python html.parser on large
+# transcript pages; fall back to html.parser when lxml isn't installed.
+PARSER = "lxml" if importlib.util.find_spec("lxml") else "html.parser"
+
+def merge_transcripts(transcript_dir: Path, output_file):
+    """Merge all transcript pages into a single HTML file.
+
+    output_file is a path, or a binary file object opened for writing.
+    """
 
     # Read index.html to get the head and initial structure
     index_path = transcript_dir / "index.html"
     with open(index_path, 'r', encoding='utf-8') as f:
-        index_soup = BeautifulSoup(f.read(), 'html.parser')
+        index_soup = BeautifulSoup(f.read(), PARSER)
 
     # Remove pagination elements from index
     for elem in index_soup.select('.pagination'):
@@ -31,7 +39,7 @@ def merge_transcripts(transcript_dir: Path, output_file: Path):
 
     for page_file in page_files:
         with open(page_file, 'r', encoding='utf-8') as f:
-            page_soup = BeautifulSoup(f.read(), 'html.parser')
+            page_soup = BeautifulSoup(f.read(), PARSER)
 
         # Find all message divs
         messages = page_soup.select('.message')
@@ -49,12 +57,18 @@ def merge_transcripts(transcript_dir: Path, output_file: Path):
     if h1_tag:
         h1_tag.string = h1_tag.string.replace('Index', 'Complete Transcript')
 
-    # Write merged HTML
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(str(index_soup))
+    # Write merged HTML; output_file may also be an open binary file, which
+    # lets callers stream into a file they already hold (no reopen by path)
+    html = str(index_soup).encode('utf-8')
+    if hasattr(output_file, 'write'):
+        output_file.write(html)
+        output_file = getattr(output_file, 'name', output_file)
+    else:
+        with open(output_file, 'wb') as f:
+            f.write(html)
 
     print(f"✓ Merged transcript saved to: {output_file}")
-    print(f"  Size: {output_file.stat().st_size / 1024:.1f} KB")
+    print(f"  Size: {len(html) / 1024:.1f} KB")
 
 if __name__ == '__main__':
     import sys
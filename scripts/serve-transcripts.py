@@ -1,12 +1,25 @@
 """HTTP file server with a custom 404 page for missing transcripts."""
 
+import functools
 import http.server
 import os
 import sys
 import tempfile
 import re
+import stat
+import zlib
 from pathlib import Path
 
+# merge-transcript.py is installed next to this script as merge_transcript.py
+# (see Dockerfile.transcripts). Import it once at startup; if it or its
+# dependencies are missing, the server still runs and only exports fail.
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+try:
+    from merge_transcript import merge_transcripts
+except ImportError as e:
+    merge_transcripts = None
+    MERGE_IMPORT_ERROR = e
+
 DIRECTORY = sys.argv[1] if len(sys.argv) > 1 else "/transcripts"
 PORT = int(os.environ.get("PORT", "8080"))
 
@@ -36,6 +49,19 @@ ERROR_404_HTML = """\
 </html>
 """
 
+HTML_CONTENT_TYPE = "text/html; charset=utf-8"
+
+# Encoded once; every 404 reuses the same body and Content-Length
+ERROR_404_BODY = ERROR_404_HTML.encode("utf-8")
+ERROR_404_LENGTH = str(len(ERROR_404_BODY))
+
+# Session directories are named by UUID; matches "/<session-id>/" in a path
+_SESSION_PATH_RE = re.compile(r'/[a-f0-9-]{36}/')
+_SESSION_ID_RE = re.compile(r'[a-f0-9]{8}-[a-f0-9]{4}-[a-f0-9]{4}-[a-f0-9]{4}-[a-f0-9]{12}')
+
+# Merged export kept inside each session directory (see handle_export)
+EXPORT_CACHE_NAME = ".export-cache.html"
+
 EXPORT_BUTTON_SCRIPT = """
 <script>
 (function() {
@@ -86,17 +112,99 @@ EXPORT_BUTTON_SCRIPT = """
 </script>
 """
 
+# Encoded once at import rather than on every injected page
+EXPORT_BUTTON_SCRIPT_BYTES = EXPORT_BUTTON_SCRIPT.encode("utf-8")
+_END_BODY = b"</body>"
+
+# Extra headers for injected pages, by response encoding
+_GZIP_HEADERS = (("Content-Encoding", "gzip"), ("Vary", "Accept-Encoding"))
+_IDENTITY_HEADERS = (("Vary", "Accept-Encoding"),)
+
+
+@functools.lru_cache(maxsize=64)
+def load_injected_page(path, mtime_ns, size):
+    """Read a transcript page and split it for export button injection.
+
+    Returns (parts, length): the byte chunks to write in order and their
+    total size, or None when the page has no </body> to inject before.
+    Keyed on mtime and size as well as the path, so a page the generator
+    rewrites is reloaded instead of served stale.
+    """
+    with open(path, 'rb') as f:
+        content = f.read()
+
+    # Inject export button before the first </body>. The page is written
+    # around the script as memoryview slices, so no second full-size copy
+    # of the body is built.
+    i = content.find(_END_BODY)
+    if i == -1:
+        # Nothing to inject: don't hold the body, it's streamed from disk
+        return None
+    view = memoryview(content)
+    parts = (view[:i], EXPORT_BUTTON_SCRIPT_BYTES, view[i:])
+    return parts, len(content) + len(EXPORT_BUTTON_SCRIPT_BYTES)
+
+
+@functools.lru_cache(maxsize=64)
+def load_gzipped_page(path, mtime_ns, size):
+    """Gzip-compressed body of an injected page, or None (see above).
+
+    Compressed once per page version and cached, so clients that accept
+    gzip get a body several times smaller at no per-request CPU cost.
+    """
+    page = load_injected_page(path, mtime_ns, size)
+    if page is None:
+        return None
+    c = zlib.compressobj(wbits=31)  # wbits=31 writes a gzip container
+    return b"".join([*map(c.compress, page[0]), c.flush()])
+
+
+def accepts_gzip(accept_encoding):
+    """Whether an Accept-Encoding header value allows gzip."""
+    for coding in accept_encoding.split(","):
+        name, *params = coding.split(";")
+        if name.strip().lower() != "gzip":
+            continue
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    return float(value) > 0
+                except ValueError:
+                    return False
+        return True
+    return False
+
 
 class TranscriptHandler(http.server.SimpleHTTPRequestHandler):
+    # Buffer writes to the socket: the header block and small bodies (404
+    # page, short pages, the injected script and page tail) go out together
+    # instead of one send() each. send_file flushes before sendfile, and
+    # the base handler flushes after every request.
+    wbufsize = 1 << 16
+    # Keep-alive: a transcript page and its assets reuse one connection
+    # instead of a TCP handshake each. Every response carries a
+    # Content-Length, which HTTP/1.1 persistence relies on. With Nagle on,
+    # a small final segment could wait on a delayed ACK between requests.
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, directory=DIRECTORY, **kwargs)
 
     def do_GET(self):
+        path = self.path
         # Handle export endpoint
-        if self.path.startswith("/export/"):
+        if path.startswith("/export/"):
             self.handle_export()
-        # For HTML files, check if we should inject export button
-        elif re.search(r'/[a-f0-9-]{36}/', self.path) and (self.path.endswith('.html') or self.path.endswith('/')):
+        # For HTML files, check if we should inject export button. The
+        # cheap length/suffix tests run first so most requests never reach
+        # the regex; "/" + 36-char ID + "/" needs at least 38 characters.
+        elif (
+            len(path) >= 38
+            and path.endswith(('.html', '/'))
+            and _SESSION_PATH_RE.search(path)
+        ):
             self.serve_html_with_export_button()
         else:
             super().do_GET()
@@ -104,31 +212,36 @@ class TranscriptHandler(http.server.SimpleHTTPRequestHandler):
     def serve_html_with_export_button(self):
         """Serve HTML file with export button injected."""
         # Translate path to file system path
-        import os
         path = self.translate_path(self.path)
 
-        # If path is a directory, serve index.html from it
-        if os.path.isdir(path):
-            path = os.path.join(path, 'index.html')
-
         try:
-            with open(path, 'rb') as f:
-                content = f.read()
-
-            # Inject export button before </body>
-            if b'</body>' in content:
-                content = content.replace(
-                    b'</body>',
-                    EXPORT_BUTTON_SCRIPT.encode('utf-8') + b'</body>',
-                    1  # Only replace first occurrence
-                )
+            # One stat answers both "is it a directory" and the cache key
+            st = os.stat(path)
+            # If path is a directory, serve index.html from it
+            if stat.S_ISDIR(st.st_mode):
+                path = os.path.join(path, 'index.html')
+                st = os.stat(path)
+            page = load_injected_page(path, st.st_mtime_ns, st.st_size)
+
+            if page is None:
+                # No </body>: send the file unchanged, kernel-side
+                with open(path, 'rb') as f:
+                    size = os.fstat(f.fileno()).st_size
+                    self.send_html_headers(size)
+                    self.send_file(f, size)
+                return
+
+            if accepts_gzip(self.headers.get("Accept-Encoding", "")):
+                parts = (load_gzipped_page(path, st.st_mtime_ns, st.st_size),)
+                length = len(parts[0])
+                headers = _GZIP_HEADERS
+            else:
+                parts, length = page
+                headers = _IDENTITY_HEADERS
 
             # Send response
-            self.send_response(200)
-            self.send_header("Content-Type", "text/html; charset=utf-8")
-            self.send_header("Content-Length", str(len(content)))
-            self.end_headers()
-            self.wfile.write(content)
+            self.send_html_headers(length, headers)
+            self.wfile.writelines(parts)
 
         except (FileNotFoundError, IsADirectoryError):
             # If path is directory or file not found, fall back to default handler
@@ -137,63 +250,121 @@ class TranscriptHandler(http.server.SimpleHTTPRequestHandler):
     def handle_export(self):
         """Generate and serve a merged single-file transcript."""
         # Extract session ID from path: /export/SESSION_ID
-        path_parts = self.path.strip("/").split("/")
-        if len(path_parts) != 2:
+        session_id = self.path[len("/export/"):].rstrip("/")
+        # Session IDs are lowercase UUIDs (8-4-4-4-12 hex digits). Checking
+        # that also keeps "..", "/" and the like from escaping DIRECTORY.
+        if not _SESSION_ID_RE.fullmatch(session_id):
             self.send_error(400, "Invalid export path")
             return
 
-        session_id = path_parts[1]
         transcript_dir = Path(DIRECTORY) / session_id
 
-        if not transcript_dir.exists() or not (transcript_dir / "index.html").exists():
+        # One directory scan finds index.html, the page-*.html files that
+        # merge_transcripts reads, and any cached export.
+        entries = {}
+        try:
+            with os.scandir(transcript_dir) as it:
+                for entry in it:
+                    name = entry.name
+                    if name in ("index.html", EXPORT_CACHE_NAME) or (
+                        name.startswith("page-") and name.endswith(".html")
+                    ):
+                        entries[name] = entry
+        except (FileNotFoundError, NotADirectoryError):
+            pass
+
+        if "index.html" not in entries:
             self.send_error(404, "Transcript not found")
             return
 
         try:
-            # Import merge function
-            sys.path.insert(0, os.path.dirname(__file__))
-            from merge_transcript import merge_transcripts
+            # Merged exports are cached next to the pages they come from and
+            # stamped with the newest source mtime, so a repeat download is
+            # served as-is until the generator rewrites the transcript.
+            cache_path = transcript_dir / EXPORT_CACHE_NAME
+            cached = entries.pop(EXPORT_CACHE_NAME, None)
+            source_mtime = max(e.stat().st_mtime_ns for e in entries.values())
+            fresh = cached is not None and cached.stat().st_mtime_ns == source_mtime
 
-            # Create temporary file for merged output
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.html', delete=False) as tmp_file:
-                tmp_path = Path(tmp_file.name)
-
-            # Merge transcript
-            merge_transcripts(transcript_dir, tmp_path)
+            if fresh:
+                f = open(cache_path, 'rb')
+            else:
+                if merge_transcripts is None:
+                    # A fresh exception per request: re-raising the stored
+                    # one would grow its traceback (and keep every failed
+                    # request's frames alive) for the life of the process.
+                    raise RuntimeError(
+                        f"merge_transcript unavailable: {MERGE_IMPORT_ERROR}"
+                    ) from MERGE_IMPORT_ERROR
+                # Merge straight into a temp file in the same directory and
+                # publish it with an atomic rename, so concurrent exports
+                # never see a partially written cache. The open temp file is
+                # then served as-is, without reopening it by path.
+                f = tempfile.NamedTemporaryFile(
+                    dir=transcript_dir, prefix=".export-", suffix=".html", delete=False
+                )
+                try:
+                    merge_transcripts(transcript_dir, f)
+                    f.flush()
+                    os.utime(f.name, ns=(source_mtime, source_mtime))
+                    os.replace(f.name, cache_path)
+                except BaseException:
+                    f.close()
+                    os.unlink(f.name)
+                    raise
 
             # Serve the merged file
-            with open(tmp_path, 'rb') as f:
-                content = f.read()
-
-            self.send_response(200)
-            self.send_header("Content-Type", "text/html; charset=utf-8")
-            self.send_header("Content-Length", str(len(content)))
-            self.send_header("Content-Disposition", f'attachment; filename="transcript-{session_id}.html"')
-            self.end_headers()
-            self.wfile.write(content)
-
-            # Clean up temp file
-            tmp_path.unlink()
+            with f:
+                size = os.fstat(f.fileno()).st_size
+                self.send_html_headers(size, (
+                    ("Content-Disposition", f'attachment; filename="transcript-{session_id}.html"'),
+                ))
+                self.send_file(f, size)
 
         except Exception as e:
             print(f"Error generating export: {e}", file=sys.stderr)
             import traceback
             traceback.print_exc()
+            # Headers may already be out; don't reuse a half-written stream
+            self.close_connection = True
             self.send_error(500, f"Export failed: {str(e)}")
 
+    def send_html_headers(self, length, headers=()):
+        """Send the 200 header block for an HTML body of length bytes."""
+        self.send_response(200)
+        self.send_header("Content-Type", HTML_CONTENT_TYPE)
+        self.send_header("Content-Length", str(length))
+        for keyword, value in headers:
+            self.send_header(keyword, value)
+        self.end_headers()
+
+    def send_file(self, f, size):
+        """Copy size bytes of an open file to the client.
+
+        socket.sendfile uses os.sendfile where available, so the kernel
+        moves the data straight from the page cache to the socket without
+        a Python-side buffer; it falls back to plain sends elsewhere.
+        """
+        self.wfile.flush()  # headers must reach the socket first
+        self.connection.sendfile(f, 0, size)
+
     def send_error(self, code, message=None, explain=None):
         if code == 404:
-            body = ERROR_404_HTML.encode("utf-8")
             self.send_response(404)
-            self.send_header("Content-Type", "text/html; charset=utf-8")
-            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Content-Type", HTML_CONTENT_TYPE)
+            self.send_header("Content-Length", ERROR_404_LENGTH)
             self.end_headers()
-            self.wfile.write(body)
+            # HEAD gets headers only; a body would corrupt the next response
+            # on a keep-alive connection
+            if self.command != "HEAD":
+                self.wfile.write(ERROR_404_BODY)
         else:
             super().send_error(code, message, explain)
 
 
 if __name__ == "__main__":
-    with http.server.HTTPServer(("", PORT), TranscriptHandler) as httpd:
+    # One thread per connection so a slow export or large page doesn't
+    # block other readers.
+    with http.server.ThreadingHTTPServer(("", PORT), TranscriptHandler) as httpd:
         print(f"Serving {DIRECTORY} on port {PORT}")
         httpd.serve_forever()